@@ -0,0 +1,37 @@
+"""
+k8s2aca: Azure Container Apps platform limits shared by the converter and validator
+"""
+
+# List of supported GPU SKUs for ACA
+SUPPORTED_GPU_SKUS = ["A100", "T4"]
+
+# Kubernetes probe fields mapped to ACA probe types
+PROBE_TYPES = {"livenessProbe": "Liveness", "readinessProbe": "Readiness", "startupProbe": "Startup"}
+
+# Allowed (min, max) values for ACA probe timing and threshold fields
+PROBE_LIMITS = {
+    "initialDelaySeconds": (0, 60),
+    "periodSeconds": (1, 240),
+    "timeoutSeconds": (1, 240),
+    "failureThreshold": (1, 10),
+    "successThreshold": (1, 10),
+}
+
+# Resources assigned when a container declares neither limits nor requests
+# (an allowed Consumption combination on its own)
+DEFAULT_CPU = 2.0
+DEFAULT_MEMORY_GI = 4.0
+
+# Largest app (sum of its containers) the Consumption workload profile accepts
+CONSUMPTION_MAX_CPU = 4.0
+CONSUMPTION_MAX_MEMORY_GI = 8.0
+
+# Consumption apps use fixed combinations: vCPU in these steps, with memory twice the vCPU in Gi
+CONSUMPTION_CPU_STEP = 0.25
+CONSUMPTION_GI_PER_CPU = 2.0
+
+# Serverless GPU workload profile for each supported GPU SKU, with the GPUs/vCPU/memory it offers per replica
+GPU_WORKLOAD_PROFILES = {
+    "A100": {"name": "Consumption-GPU-NC24-A100", "gpus": 1, "cpu": 24.0, "memory_gi": 220.0},
+    "T4": {"name": "Consumption-GPU-NC8as-T4", "gpus": 1, "cpu": 8.0, "memory_gi": 56.0},
+}
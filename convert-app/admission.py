@@ -0,0 +1,212 @@
+"""
+Admission control and upload limits for the k8s2aca web service.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+import yaml
+from werkzeug.exceptions import TooManyRequests
+
+
+class WorkerLoad:
+    """Per-process load counters in shared memory, readable from any worker in the replica.
+
+    The table must be created before gunicorn forks its workers (preload_app), so every
+    worker inherits the same memory. Each process claims a slot keyed by its pid (gunicorn's
+    post_fork hook does so at boot, recording the worker's thread count) and the child_exit
+    hook frees it when the worker exits.
+    """
+
+    PID, INFLIGHT, WAITING, ACTIVE, THREADS = range(5)
+    FIELDS = 5
+
+    def __init__(self, max_workers=64):
+        self.max_workers = max_workers
+        self._table = multiprocessing.Array('q', max_workers * self.FIELDS)
+        self._slot_pid = None
+        self._slot = None
+
+    def register(self, threads=None):
+        """Slot index for the calling process, claiming a free one if needed (None if full).
+
+        `threads` records how many server threads the process has; it stays 0 (unknown)
+        when the app is not served by gunicorn.
+        """
+        pid = os.getpid()
+        if self._slot_pid == pid and threads is None:
+            return self._slot
+        table = self._table
+        with table.get_lock():
+            pids = table[self.PID::self.FIELDS]
+            if pid in pids:
+                index = pids.index(pid)
+            else:
+                index = pids.index(0) if 0 in pids else None
+                if index is not None:
+                    base = index * self.FIELDS
+                    table[base:base + self.FIELDS] = [pid, 0, 0, 0, 0]
+            if index is not None and threads is not None:
+                table[index * self.FIELDS + self.THREADS] = threads
+        self._slot_pid, self._slot = pid, index
+        return index
+
+    def add(self, field, delta):
+        """Adjust one counter for the calling process."""
+        index = self.register()
+        if index is not None:
+            with self._table.get_lock():
+                self._table[index * self.FIELDS + field] += delta
+
+    def release(self, pid):
+        """Free the slot held by an exited process."""
+        table = self._table
+        with table.get_lock():
+            for base in range(0, len(table), self.FIELDS):
+                if table[base + self.PID] == pid:
+                    table[base:base + self.FIELDS] = [0] * self.FIELDS
+
+    def totals(self):
+        """Sum the counters of every live process."""
+        with self._table.get_lock():
+            rows = [row for row in zip(*[iter(self._table[:])] * self.FIELDS) if row[self.PID]]
+        return {
+            'workers': len(rows),
+            'inflight': sum(row[self.INFLIGHT] for row in rows),
+            'waiting': sum(row[self.WAITING] for row in rows),
+            'active_requests': sum(row[self.ACTIVE] for row in rows),
+            'threads': sum(row[self.THREADS] for row in rows),
+        }
+
+
+# Created at import, which gunicorn does once in the master when preload_app is set
+worker_load = WorkerLoad()
+
+
+class AdmissionController:
+    """Bound the number of in-flight conversions, with a bounded wait queue in front."""
+
+    def __init__(self, max_inflight, max_queued, queue_timeout, retry_after, load=worker_load):
+        self.max_inflight = max_inflight
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.load = load
+        self._condition = threading.Condition()
+        self._inflight = 0
+        self._waiting = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a controller from Flask app config."""
+        return cls(
+            max_inflight=config['MAX_INFLIGHT_CONVERSIONS'],
+            max_queued=config['MAX_QUEUED_CONVERSIONS'],
+            queue_timeout=config['CONVERSION_QUEUE_TIMEOUT'],
+            retry_after=config['CONVERSION_RETRY_AFTER'],
+        )
+
+    def acquire(self):
+        """Take a conversion slot, waiting in the queue if needed. Returns False if rejected."""
+        with self._condition:
+            if self._inflight < self.max_inflight:
+                self._inflight += 1
+                self.load.add(WorkerLoad.INFLIGHT, 1)
+                return True
+            if self._waiting >= self.max_queued:
+                self._rejected += 1
+                return False
+            self._waiting += 1
+            self.load.add(WorkerLoad.WAITING, 1)
+            try:
+                deadline = time.monotonic() + self.queue_timeout
+                while self._inflight >= self.max_inflight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._rejected += 1
+                        return False
+                    self._condition.wait(remaining)
+                self._inflight += 1
+                self.load.add(WorkerLoad.INFLIGHT, 1)
+                return True
+            finally:
+                self._waiting -= 1
+                self.load.add(WorkerLoad.WAITING, -1)
+
+    def release(self):
+        """Return a conversion slot and wake one queued request."""
+        with self._condition:
+            self._inflight -= 1
+            self.load.add(WorkerLoad.INFLIGHT, -1)
+            self._condition.notify()
+
+    def request_started(self):
+        """Count a request (of any kind) now holding a server thread in this process."""
+        self.load.add(WorkerLoad.ACTIVE, 1)
+
+    def request_finished(self):
+        """Count a request releasing its server thread."""
+        self.load.add(WorkerLoad.ACTIVE, -1)
+
+    @contextmanager
+    def slot(self):
+        """Hold a conversion slot for the duration of the block, or raise 429."""
+        if not self.acquire():
+            raise TooManyRequests(
+                description='The converter is busy. Please retry shortly.',
+                retry_after=self.retry_after,
+            )
+        try:
+            yield
+        finally:
+            self.release()
+
+    def limit(self, view):
+        """Decorator that runs a Flask view inside a conversion slot."""
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            with self.slot():
+                return view(*args, **kwargs)
+        return wrapper
+
+    def stats(self):
+        """Snapshot of this process's admission state."""
+        with self._condition:
+            return {
+                'inflight': self._inflight,
+                'waiting': self._waiting,
+                'rejected': self._rejected,
+                'max_inflight': self.max_inflight,
+                'max_queued': self.max_queued,
+            }
+
+    def replica_stats(self):
+        """Admission and request counters summed over every worker process in this replica."""
+        stats = self.load.totals()
+        stats['max_inflight'] = self.max_inflight
+        stats['max_queued'] = self.max_queued
+        return stats
+
+
+def check_manifest_limits(file_path, max_documents, max_depth):
+    """Stream YAML events to enforce document count and nesting depth before a full parse."""
+    documents = 0
+    depth = 0
+    with open(file_path, 'r') as f:
+        for event in yaml.parse(f, Loader=yaml.SafeLoader):
+            if isinstance(event, yaml.DocumentStartEvent):
+                documents += 1
+                if documents > max_documents:
+                    return False, f"File contains more than {max_documents} YAML documents"
+            elif isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+                depth += 1
+                if depth > max_depth:
+                    return False, f"YAML nesting is deeper than {max_depth} levels"
+            elif isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+                depth -= 1
+    return True, "Within limits"
@@ -3,7 +3,7 @@ import os
 import tempfile
 import yaml
 from werkzeug.utils import secure_filename
-from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.exceptions import RequestEntityTooLarge, TooManyRequests
 import logging
 from datetime import datetime
 import uuid
@@ -12,6 +12,7 @@ import secrets
 
 # Import the existing conversion logic
 from main import convert_k8s_to_aca
+from admission import AdmissionController, check_manifest_limits
 
 app = Flask(__name__)
 
@@ -33,6 +34,31 @@ app.secret_key = get_secret_key()
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
 
+# Admission control: conversions allowed to run at once per worker process, how many may
+# wait for a slot (and for how long), and the Retry-After hint sent when the queue is full.
+# Queued requests hold a server thread, so keep in-flight + queued below the thread count
+# in gunicorn.conf.py to leave room for health probes.
+app.config['MAX_INFLIGHT_CONVERSIONS'] = int(os.environ.get('MAX_INFLIGHT_CONVERSIONS', 2))
+app.config['MAX_QUEUED_CONVERSIONS'] = int(os.environ.get('MAX_QUEUED_CONVERSIONS', 4))
+app.config['CONVERSION_QUEUE_TIMEOUT'] = float(os.environ.get('CONVERSION_QUEUE_TIMEOUT', 10))
+app.config['CONVERSION_RETRY_AFTER'] = int(os.environ.get('CONVERSION_RETRY_AFTER', 5))
+
+# Per-upload limits, checked by streaming the YAML before it is fully parsed
+app.config['MAX_MANIFEST_DOCUMENTS'] = int(os.environ.get('MAX_MANIFEST_DOCUMENTS', 500))
+app.config['MAX_MANIFEST_DEPTH'] = int(os.environ.get('MAX_MANIFEST_DEPTH', 64))
+
+admission = AdmissionController.from_config(app.config)
+
+@app.before_request
+def track_request_start():
+    """Count this request against the replica's busy server threads."""
+    admission.request_started()
+
+@app.teardown_request
+def track_request_end(exc):
+    """Release this request's server thread in the replica load counters."""
+    admission.request_finished()
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'yaml', 'yml'}
 
@@ -44,6 +70,11 @@ def allowed_file(filename):
 def validate_k8s_manifest(file_path):
     """Validate that the uploaded file is a valid Kubernetes manifest."""
     try:
+        within_limits, message = check_manifest_limits(
+            file_path, app.config['MAX_MANIFEST_DOCUMENTS'], app.config['MAX_MANIFEST_DEPTH'])
+        if not within_limits:
+            return False, message
+
         with open(file_path, 'r') as f:
             documents = list(yaml.safe_load_all(f))
             
@@ -75,7 +106,30 @@ def index():
     """Main page with file upload form."""
     return render_template('index.html')
 
+@app.route('/healthz')
+def healthz():
+    """Liveness probe: the worker is up and serving requests."""
+    return jsonify({'status': 'ok'})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe: report not-ready while any worker in this replica is queueing
+    conversions or every server thread is busy.
+
+    Counters are shared across gunicorn workers through memory created before the fork
+    (preload_app in gunicorn.conf.py), so the answer covers the whole replica whichever
+    worker serves the probe. Without preloading, each worker sees only its own load. Thread
+    counts come from gunicorn's running config, so outside gunicorn only queueing is checked.
+    """
+    stats = admission.replica_stats()
+    # The probe itself holds one thread, so "all busy" includes it
+    threads_busy = stats['threads'] > 0 and stats['active_requests'] >= stats['threads']
+    saturated = stats['waiting'] > 0 or threads_busy
+    stats['status'] = 'saturated' if saturated else 'ready'
+    return jsonify(stats), 503 if saturated else 200
+
 @app.route('/upload', methods=['POST'])
+@admission.limit
 def upload_file():
     """Handle file upload and conversion."""
     try:
@@ -188,6 +242,7 @@ def download_file(filename):
         return redirect(url_for('index'))
 
 @app.route('/api/convert', methods=['POST'])
+@admission.limit
 def api_convert():
     """API endpoint for programmatic conversion."""
     try:
@@ -260,6 +315,17 @@ def handle_file_too_large(e):
     flash('File too large. Maximum size is 16MB.', 'error')
     return redirect(url_for('index'))
 
+@app.errorhandler(TooManyRequests)
+def handle_too_many_requests(e):
+    """Handle conversions rejected by admission control."""
+    if request.path.startswith('/api/'):
+        response = jsonify({'error': e.description})
+    else:
+        response = app.make_response(render_template('429.html'))
+    response.status_code = 429
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
 @app.errorhandler(404)
 def page_not_found(e):
     """Handle 404 errors."""
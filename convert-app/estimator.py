@@ -0,0 +1,244 @@
+"""
+k8s2aca: Cluster-wide ACA capacity and cost estimator
+
+Walks a tree of Kubernetes exports (such as agent/workspace/k8s_exports or
+agent/workspace/aks_namespace_exports), collects every container's CPU, memory,
+GPU and replica values into columnar NumPy arrays and aggregates them per
+namespace and per ACA workload profile.
+"""
+
+# ===================== Imports =====================
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from aca_limits import DEFAULT_CPU, DEFAULT_MEMORY_GI
+from main import iter_export_documents, needs_dedicated_profile, parse_cpu_quantity, parse_memory_quantity
+
+# ===================== Constants =====================
+# Consumption plan pay-as-you-go list prices (USD, active usage)
+CONSUMPTION_VCPU_SECOND_PRICE = 0.000024
+CONSUMPTION_GIB_SECOND_PRICE = 0.000003
+SECONDS_PER_MONTH = 730 * 3600
+
+PROFILES = ["Consumption", "Dedicated", "GPU"]
+POD_KINDS = {"Deployment", "StatefulSet", "DaemonSet", "ReplicaSet", "Pod"}
+
+
+# ===================== Workload Helpers =====================
+def _pod_spec(resource):
+    if resource.get('kind') == 'Pod':
+        return resource.get('spec') or {}
+    return ((resource.get('spec') or {}).get('template') or {}).get('spec') or {}
+
+
+def _replicas(resource):
+    kind = resource.get('kind')
+    if kind == 'Pod':
+        return 1
+    if kind == 'DaemonSet':
+        # ACA has no per-node scheduling; one replica is the closest equivalent
+        return 1
+    replicas = (resource.get('spec') or {}).get('replicas')
+    return 1 if replicas is None else int(replicas)
+
+
+# ===================== Columnar Collection =====================
+class ContainerTable:
+    """Columnar view of every container found in an export tree."""
+
+    def __init__(self, rows, workload_keys, namespaces):
+        self.namespaces = namespaces
+        self.workload_keys = workload_keys
+        columns = list(zip(*rows)) if rows else [()] * 10
+        (namespace_idx, workload_idx, cpu_req, cpu_lim, mem_req, mem_lim,
+         gpus, replicas, max_replicas, _) = columns
+        self.namespace_idx = np.asarray(namespace_idx, dtype=np.int64)
+        self.workload_idx = np.asarray(workload_idx, dtype=np.int64)
+        self.cpu_request = np.asarray(cpu_req, dtype=np.float64)
+        self.cpu_limit = np.asarray(cpu_lim, dtype=np.float64)
+        self.memory_request_gi = np.asarray(mem_req, dtype=np.float64)
+        self.memory_limit_gi = np.asarray(mem_lim, dtype=np.float64)
+        self.gpus = np.asarray(gpus, dtype=np.int64)
+        self.replicas = np.asarray(replicas, dtype=np.int64)
+        self.max_replicas = np.asarray(max_replicas, dtype=np.int64)
+        self.names = [row[9] for row in rows]
+        self.profile_idx = self._assign_profiles()
+
+    def __len__(self):
+        return len(self.cpu_request)
+
+    def _assign_profiles(self):
+        # Apply the converter's rule (main.needs_dedicated_profile) to each workload's summed
+        # limits, which is what map_pod_resource writes into the ACA template.
+        size = len(self.workload_keys)
+        workload_cpu = _grouped(self.workload_idx, size, self.cpu_limit)
+        workload_memory = _grouped(self.workload_idx, size, self.memory_limit_gi)
+        workload_dedicated = needs_dedicated_profile(workload_cpu, workload_memory)
+        # GPU workloads go to a serverless GPU profile (unless the GPU is skipped interactively)
+        workload_gpu = _grouped(self.workload_idx, size, self.gpus) > 0
+        workload_profile = np.where(workload_gpu, 2, workload_dedicated.astype(np.int64))
+        return workload_profile[self.workload_idx]
+
+
+def collect_containers(root):
+    # Parse every pod-bearing resource under `root` into a ContainerTable.
+    resources = []
+    hpa_max = {}
+    for _, doc in iter_export_documents(root):
+        kind = doc.get('kind')
+        metadata = doc.get('metadata') or {}
+        namespace = metadata.get('namespace', 'default')
+        if kind == 'HorizontalPodAutoscaler':
+            spec = doc.get('spec') or {}
+            target = (spec.get('scaleTargetRef') or {}).get('name')
+            if target and spec.get('maxReplicas') is not None:
+                hpa_max[(namespace, target)] = int(spec['maxReplicas'])
+        elif kind in POD_KINDS:
+            # Pods and ReplicaSets owned by a controller are already counted via the controller
+            if metadata.get('ownerReferences'):
+                continue
+            resources.append((namespace, doc))
+
+    namespaces = []
+    namespace_codes = {}
+    workload_keys = []
+    rows = []
+    for namespace, resource in resources:
+        name = (resource.get('metadata') or {}).get('name', 'unnamed')
+        if namespace not in namespace_codes:
+            namespace_codes[namespace] = len(namespaces)
+            namespaces.append(namespace)
+        workload_idx = len(workload_keys)
+        workload_keys.append((namespace, resource.get('kind'), name))
+        replicas = _replicas(resource)
+        max_replicas = max(replicas, hpa_max.get((namespace, name), replicas))
+        for container in _pod_spec(resource).get('containers') or []:
+            resources_spec = container.get('resources') or {}
+            limits = resources_spec.get('limits') or {}
+            requests = resources_spec.get('requests') or {}
+            cpu_req, cpu_lim = _request_and_limit(requests, limits, 'cpu', parse_cpu_quantity, DEFAULT_CPU)
+            mem_req, mem_lim = _request_and_limit(requests, limits, 'memory', parse_memory_quantity, DEFAULT_MEMORY_GI)
+            try:
+                gpus = int(limits.get('nvidia.com/gpu', 0))
+            except (TypeError, ValueError):
+                gpus = 0
+            rows.append((
+                namespace_codes[namespace], workload_idx, cpu_req, cpu_lim, mem_req, mem_lim,
+                gpus, replicas, max_replicas, f"{namespace}/{name}/{container.get('name')}",
+            ))
+    return ContainerTable(rows, workload_keys, namespaces)
+
+
+def _request_and_limit(requests, limits, key, parse, default):
+    # Kubernetes defaults a missing request to the limit; the converter defaults a
+    # missing limit to the request, or to its fixed ACA default when neither is set.
+    request = parse(requests[key]) if key in requests else None
+    limit = parse(limits[key]) if key in limits else None
+    if request is None:
+        request = limit
+    if limit is None:
+        limit = request
+    if request is None:
+        request = limit = default
+    return request, limit
+
+
+# ===================== Aggregation =====================
+def _grouped(codes, size, weights):
+    return np.bincount(codes, weights=weights, minlength=size) if len(codes) else np.zeros(size)
+
+
+def _ratio(numerator, denominator):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator > 0, numerator / denominator, np.nan)
+
+
+def estimate(table):
+    # Aggregate a ContainerTable into per-namespace and per-profile capacity estimates.
+    # ACA allocates (and bills) what the converter writes into the template: the limit,
+    # falling back to the request and then the default. Requests only feed the ratios.
+    steady_cpu = table.cpu_limit * table.replicas
+    steady_mem = table.memory_limit_gi * table.replicas
+    request_cpu = table.cpu_request * table.replicas
+    request_mem = table.memory_request_gi * table.replicas
+    peak_cpu = table.cpu_limit * table.max_replicas
+    peak_mem = table.memory_limit_gi * table.max_replicas
+    peak_gpus = table.gpus * table.max_replicas
+    consumption = table.profile_idx == 0
+
+    def summarize(codes, labels):
+        size = len(labels)
+        totals = {
+            "containers": _grouped(codes, size, None),
+            "steady_vcpu": _grouped(codes, size, steady_cpu),
+            "steady_memory_gi": _grouped(codes, size, steady_mem),
+            "peak_vcpu": _grouped(codes, size, peak_cpu),
+            "peak_memory_gi": _grouped(codes, size, peak_mem),
+            "peak_gpus": _grouped(codes, size, peak_gpus),
+        }
+        # Only Consumption capacity is billed per vCPU/GiB-second; Dedicated is billed per node
+        steady_cost = (
+            _grouped(codes, size, np.where(consumption, steady_cpu, 0.0)) * CONSUMPTION_VCPU_SECOND_PRICE
+            + _grouped(codes, size, np.where(consumption, steady_mem, 0.0)) * CONSUMPTION_GIB_SECOND_PRICE
+        ) * SECONDS_PER_MONTH
+        totals["cpu_over_request_ratio"] = _ratio(
+            totals["steady_vcpu"], _grouped(codes, size, request_cpu))
+        totals["memory_over_request_ratio"] = _ratio(
+            totals["steady_memory_gi"], _grouped(codes, size, request_mem))
+        totals["consumption_monthly_cost_usd"] = steady_cost
+        return {
+            label: {key: _scalar(values[i]) for key, values in totals.items()}
+            for i, label in enumerate(labels)
+        }
+
+    container_ratio = _ratio(table.cpu_limit, table.cpu_request)
+    return {
+        "containers": len(table),
+        "workloads": len(table.workload_keys),
+        "by_namespace": summarize(table.namespace_idx, table.namespaces),
+        "by_profile": summarize(table.profile_idx, PROFILES),
+        "max_cpu_over_request_ratio": _scalar(np.nanmax(container_ratio)) if len(table) else None,
+    }
+
+
+def _scalar(value):
+    value = float(value)
+    if np.isnan(value):
+        return None
+    return int(value) if value.is_integer() else round(value, 3)
+
+
+# ===================== Reporting =====================
+def format_report(result):
+    lines = [f"Containers: {result['containers']}  Workloads: {result['workloads']}", ""]
+    header = f"{'':<32}{'steady vCPU':>12}{'steady GiB':>12}{'peak vCPU':>12}{'peak GiB':>12}{'GPUs':>6}{'CPU lim/req':>13}{'$/month':>10}"
+    for title, groups in (("Namespace", result["by_namespace"]), ("Profile", result["by_profile"])):
+        lines.append(f"{title:<32}" + header[32:])
+        for label, row in groups.items():
+            ratio = row["cpu_over_request_ratio"]
+            lines.append(
+                f"{label[:31]:<32}{row['steady_vcpu']:>12}{row['steady_memory_gi']:>12}"
+                f"{row['peak_vcpu']:>12}{row['peak_memory_gi']:>12}{row['peak_gpus']:>6}"
+                f"{'-' if ratio is None else ratio:>13}{row['consumption_monthly_cost_usd']:>10}"
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+# ===================== Entry Point =====================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimate ACA capacity for a tree of Kubernetes exports.")
+    parser.add_argument("export_root", help="Export directory or manifest file")
+    parser.add_argument("--json", action="store_true", help="Print the estimate as JSON")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.export_root):
+        print(f"[Error] {args.export_root} does not exist.")
+        sys.exit(1)
+
+    result = estimate(collect_containers(args.export_root))
+    print(json.dumps(result, indent=2) if args.json else format_report(result))
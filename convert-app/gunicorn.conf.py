@@ -0,0 +1,70 @@
+"""
+Gunicorn configuration for the k8s2aca web service.
+
+Worker and thread counts are sized from the CPU actually available to the
+container (cgroup quota or CPU affinity), not the host's core count. Every
+value can be overridden with the matching GUNICORN_* environment variable.
+"""
+
+import math
+import os
+
+from admission import worker_load
+
+
+def available_cpus():
+    """CPUs available to this container, honouring cgroup v2/v1 quotas."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else (os.cpu_count() or 1)
+    try:
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            cpus = min(cpus, float(quota) / float(period))
+    except (OSError, ValueError):
+        try:
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+                quota = int(f.read())
+            with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+                period = int(f.read())
+            if quota > 0:
+                cpus = min(cpus, quota / period)
+        except (OSError, ValueError):
+            pass
+    return max(1, math.ceil(cpus))
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Conversions are CPU-bound YAML work, so run one process per CPU plus one spare
+# and use threads to keep health probes and downloads responsive while converting.
+worker_class = 'gthread'
+workers = int(os.environ.get('GUNICORN_WORKERS', available_cpus() + 1))
+
+# Queued conversions hold a thread (see MAX_INFLIGHT_CONVERSIONS / MAX_QUEUED_CONVERSIONS
+# in app.py), so leave spare threads above in-flight + queued for /healthz and /readyz.
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+
+# Recycle workers periodically, with jitter so they don't all restart at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 120))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+accesslog = '-'
+errorlog = '-'
+
+
+def post_fork(server, worker):
+    """Claim the new worker's slot in the shared load table so /readyz counts its threads."""
+    # server.cfg reflects command-line overrides (e.g. --threads), unlike the values above
+    worker_load.register(threads=server.cfg.threads)
+
+
+def child_exit(server, worker):
+    """Free an exited worker's slot in the shared load table so /readyz stops counting it."""
+    worker_load.release(worker.pid)
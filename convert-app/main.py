@@ -6,10 +6,29 @@ k8s2aca: Kubernetes to Azure Container Apps Converter
 import yaml
 import os
 import sys
+import copy
+import hashlib
+import json
+import math
+import re
+
+from aca_limits import (
+    SUPPORTED_GPU_SKUS, PROBE_TYPES, PROBE_LIMITS,
+    DEFAULT_CPU, DEFAULT_MEMORY_GI, CONSUMPTION_MAX_CPU, CONSUMPTION_MAX_MEMORY_GI, CONSUMPTION_CPU_STEP,
+    CONSUMPTION_GI_PER_CPU, GPU_WORKLOAD_PROFILES,
+)
+from validator import validate_template
 
 # ===================== Constants =====================
-# List of supported GPU SKUs for ACA
-SUPPORTED_GPU_SKUS = ["A100", "T4"]
+# Service appProtocol values (the part after any "<domain>/" prefix) mapped to ACA ingress transports
+# (gRPC-Web is served over HTTP/1.1, so it must not be treated as gRPC)
+APP_PROTOCOL_TRANSPORTS = {
+    "grpc-web": "http", "grpc": "http2", "h2c": "http2", "http2": "http2", "tcp": "tcp", "http": "http", "https": "http",
+}
+
+# Service/container port name protocols mapped to ACA ingress transports, longest first so
+# "grpc-web" is matched before "grpc"
+PORT_NAME_TRANSPORTS = {"grpc-web": "http", "grpc": "http2", "h2c": "http2", "http2": "http2", "tcp": "tcp"}
 
 # ===================== Main Conversion Logic =====================
 def convert_k8s_to_aca(input_file, output_file):
@@ -156,8 +175,6 @@ def convert_k8s_to_aca(input_file, output_file):
 
 # ===================== Helper Functions =====================
 
-SUPPORTED_GPU_SKUS = ["A100", "T4"]
-
 def prompt_choice(message, choices):
     print(message)
     for idx, choice in enumerate(choices, 1):
@@ -178,9 +195,75 @@ def detect_gpu(container):
         return int(limits['nvidia.com/gpu'])
     return 0
 
+# Kubernetes quantity suffixes, expressed as multipliers of one byte
+MEMORY_SUFFIXES = {
+    "Ki": 1024, "Mi": 1024 ** 2, "Gi": 1024 ** 3, "Ti": 1024 ** 4, "Pi": 1024 ** 5, "Ei": 1024 ** 6,
+    "k": 1000, "K": 1000, "M": 1000 ** 2, "G": 1000 ** 3, "T": 1000 ** 4, "P": 1000 ** 5, "E": 1000 ** 6,
+}
+
+def parse_cpu_quantity(value):
+    # Parse a Kubernetes CPU quantity ("500m", "0.5", 2) into cores. Returns None if unparseable.
+    try:
+        text = str(value).strip()
+        if text.endswith('m'):
+            return float(text[:-1]) / 1000
+        return float(text)
+    except (TypeError, ValueError):
+        return None
+
+def parse_memory_quantity(value):
+    # Parse a Kubernetes memory quantity ("512Mi", "1G", "1e9", 1024) into GiB. Returns None if unparseable.
+    text = str(value).strip()
+    multiplier = 1
+    for suffix in sorted(MEMORY_SUFFIXES, key=len, reverse=True):
+        if text.endswith(suffix):
+            multiplier = MEMORY_SUFFIXES[suffix]
+            text = text[:-len(suffix)]
+            break
+    try:
+        return float(text) * multiplier / 1024 ** 3
+    except ValueError:
+        return None
+
+def resolve_quantity(limits, requests, key, parse, default, container, migration_report):
+    # ACA gets one value per resource: the limit, else the request, else the default.
+    for source, values in (("limit", limits), ("request", requests)):
+        if key in values:
+            value = parse(values[key])
+            if value is not None:
+                return value
+            migration_report.append(f"[Warning] Could not parse {key} {source} '{values[key]}' for container {container.get('name')}.")
+    if key in limits or key in requests:
+        migration_report.append(f"[Warning] Using default {key} {default} for container {container.get('name')}.")
+    return default
+
+def needs_dedicated_profile(total_cpu, total_memory_gi):
+    # Whether an app's summed container resources exceed the Consumption profile.
+    # Works on scalars and on NumPy arrays, so the estimator applies the same rule.
+    return (total_cpu > CONSUMPTION_MAX_CPU) | (total_memory_gi > CONSUMPTION_MAX_MEMORY_GI)
+
+def select_workload_profile(total_cpu, total_memory_gi, gpu_sku=None):
+    # Workload profile for an app: the serverless GPU profile for its GPU SKU, Dedicated when it
+    # exceeds the Consumption limits, or None to stay on Consumption.
+    if gpu_sku:
+        return GPU_WORKLOAD_PROFILES[gpu_sku]["name"]
+    if needs_dedicated_profile(total_cpu, total_memory_gi):
+        return "Dedicated"
+    return None
+
+def consumption_allocation(total_cpu, total_memory_gi):
+    # Smallest allowed Consumption combination (vCPU, Gi) that covers an app's summed resources.
+    steps = max(
+        math.ceil(total_cpu / CONSUMPTION_CPU_STEP - 1e-9),
+        math.ceil(total_memory_gi / (CONSUMPTION_CPU_STEP * CONSUMPTION_GI_PER_CPU) - 1e-9),
+        1,
+    )
+    cpu = steps * CONSUMPTION_CPU_STEP
+    return cpu, cpu * CONSUMPTION_GI_PER_CPU
+
 def map_gpu_to_aca(gpu_count):
     print(f"[Info] GPU resource detected: {gpu_count} x nvidia.com/gpu")
-    print("ACA supports only certain GPU SKUs (A100, T4) and up to 4 GPUs per container.")
+    print("ACA serverless GPU profiles support only certain GPU SKUs (A100, T4), with one GPU per replica.")
     sku = prompt_choice("Choose a supported GPU SKU:", SUPPORTED_GPU_SKUS + ["Skip GPU (run on CPU only)"])
     if sku.startswith("Skip"):
         return None, None
@@ -218,6 +301,69 @@ def map_ports(container):
             ports.append({"port": port['containerPort']})
     return ports
 
+def resolve_target_port(target_port, containers):
+    # Resolve a Service targetPort, which may be a container port name, to a port number.
+    # Returns (port_number, container_port_entry); the entry is None if no container declares the port.
+    for container in containers:
+        for port in container.get('ports', []):
+            if port.get('name') == target_port or port.get('containerPort') == target_port:
+                return port.get('containerPort'), port
+    if isinstance(target_port, str) and not target_port.isdigit():
+        return None, None
+    return int(target_port), None
+
+def detect_transport(service_port, container_port):
+    # Pick an ACA transport from the Service appProtocol, then the Service and container port names.
+    app_protocol = str(service_port.get('appProtocol', '')).lower()
+    if app_protocol:
+        transport = APP_PROTOCOL_TRANSPORTS.get(app_protocol.split('/')[-1])
+        if transport:
+            return transport
+    names = [service_port.get('name'), (container_port or {}).get('name')]
+    for name in names:
+        if not name:
+            continue
+        # Port names follow the "<protocol>[-<suffix>]" convention (e.g. "grpc-api", "http2-api")
+        lowered = str(name).lower()
+        for protocol, transport in PORT_NAME_TRANSPORTS.items():
+            if lowered == protocol or lowered.startswith(protocol + '-'):
+                return transport
+    return "auto"
+
+def map_service_ports(svc, ports, containers, external, migration_report):
+    # Build ACA ingress from a Service: the first port becomes the main ingress and any other
+    # ports become additionalPortMappings (ACA exposes these over TCP).
+    svc_name = svc['metadata']['name']
+    mapped = []
+    for port in ports:
+        if str(port.get('protocol', 'TCP')).upper() != 'TCP':
+            migration_report.append(f"[Unsupported] Service '{svc_name}' port {port.get('port')} uses {port.get('protocol')}. ACA ingress only supports TCP.")
+            continue
+        target = port.get('targetPort', port.get('port'))
+        number, container_port = resolve_target_port(target, containers)
+        if number is None:
+            migration_report.append(f"[Warning] Service '{svc_name}' targetPort '{target}' does not match any container port name. Manual review needed.")
+            continue
+        mapped.append((port, number, detect_transport(port, container_port)))
+
+    if not mapped:
+        return {"external": external, "targetPort": 80, "transport": "auto"}
+
+    primary, target_port, transport = mapped[0]
+    aca_ingress = {"external": external, "targetPort": target_port, "transport": transport}
+    if transport == "tcp":
+        aca_ingress["exposedPort"] = primary.get('port', target_port)
+        migration_report.append(f"[Info] Service '{svc_name}' uses TCP transport. ACA TCP ingress requires an environment with a custom VNet.")
+    if len(mapped) > 1:
+        aca_ingress["additionalPortMappings"] = [
+            {"external": external, "targetPort": number, "exposedPort": port.get('port', number)}
+            for port, number, _ in mapped[1:]
+        ]
+        migration_report.append(f"[Info] Service '{svc_name}' ports {', '.join(str(p.get('port')) for p, _, _ in mapped[1:])} mapped to ACA additionalPortMappings (TCP).")
+        if any(t == "http2" for _, _, t in mapped[1:]):
+            migration_report.append(f"[Warning] Service '{svc_name}' has additional HTTP/2 or gRPC ports. ACA only applies HTTP/2 transport to the main ingress port; consider splitting them into separate apps.")
+    return aca_ingress
+
 def map_volumes(volumes, volume_mounts):
     aca_volumes = []
     for mount in volume_mounts:
@@ -236,41 +382,107 @@ def map_volumes(volumes, volume_mounts):
                 aca_volumes.append({"name": vol_name, "storageType": "AzureBlob", "mountPath": mount['mountPath']})
     return aca_volumes
 
-def map_probes(container):
-    probes = {}
-    for probe_type in ["livenessProbe", "readinessProbe"]:
-        if probe_type in container:
-            probe = container[probe_type]
-            if 'httpGet' in probe:
-                probes[probe_type] = {
-                    "type": "http",
-                    "path": probe['httpGet']['path'],
-                    "port": probe['httpGet']['port']
-                }
-            elif 'tcpSocket' in probe:
-                probes[probe_type] = {
-                    "type": "tcp",
-                    "port": probe['tcpSocket']['port']
-                }
-            else:
-                print(f"[Warning] Probe type in {probe_type} not directly supported in ACA.")
+def map_probes(container, migration_report=None):
+    # Map liveness/readiness/startup probes, including timing and threshold fields, to the
+    # ACA probe schema. Values outside ACA limits are clamped and noted in the migration report.
+    probes = []
+    name = container.get('name')
+    named_ports = {p['name']: p['containerPort'] for p in container.get('ports', []) if 'name' in p and 'containerPort' in p}
+
+    def note(message):
+        print(f"[Warning] {message}")
+        if migration_report is not None:
+            migration_report.append(f"[Warning] {message}")
+
+    def resolve_port(port, probe_type):
+        # Probes may reference a named container port; ACA only accepts numbers
+        if isinstance(port, str) and not port.isdigit():
+            if port in named_ports:
+                return named_ports[port]
+            note(f"{probe_type} for container '{name}' references unknown port '{port}'. Manual review needed.")
+            return None
+        return int(port)
+
+    for probe_type, aca_type in PROBE_TYPES.items():
+        if probe_type not in container:
+            continue
+        probe = container[probe_type]
+        aca_probe = {"type": aca_type}
+        if 'httpGet' in probe:
+            http_get = probe['httpGet']
+            port = resolve_port(http_get.get('port'), probe_type)
+            if port is None:
+                continue
+            aca_probe["httpGet"] = {"path": http_get.get('path', '/'), "port": port}
+            if 'scheme' in http_get:
+                aca_probe["httpGet"]["scheme"] = str(http_get['scheme']).upper()
+            if http_get.get('httpHeaders'):
+                aca_probe["httpGet"]["httpHeaders"] = [
+                    {"name": h['name'], "value": h['value']} for h in http_get['httpHeaders']
+                ]
+        elif 'tcpSocket' in probe:
+            port = resolve_port(probe['tcpSocket'].get('port'), probe_type)
+            if port is None:
+                continue
+            aca_probe["tcpSocket"] = {"port": port}
+        else:
+            note(f"Probe type in {probe_type} for container '{name}' not directly supported in ACA (only httpGet and tcpSocket). Probe skipped.")
+            continue
+
+        for field, (low, high) in PROBE_LIMITS.items():
+            if field not in probe:
+                continue
+            value = int(probe[field])
+            clamped = min(max(value, low), high)
+            if clamped != value:
+                note(f"{probe_type}.{field} for container '{name}' clamped from {value} to {clamped} (ACA allows {low}-{high}).")
+            aca_probe[field] = clamped
+
+        # Clamping failureThreshold shrinks the window a slow-starting app gets before restart;
+        # stretch periodSeconds so periodSeconds * failureThreshold stays as close as ACA allows.
+        if 'failureThreshold' in probe and aca_probe["failureThreshold"] < int(probe['failureThreshold']):
+            period = int(probe.get('periodSeconds', 10))
+            window = period * int(probe['failureThreshold'])
+            stretched = min(-(-window // aca_probe["failureThreshold"]), PROBE_LIMITS["periodSeconds"][1])
+            if stretched > aca_probe.get("periodSeconds", period):
+                aca_probe["periodSeconds"] = stretched
+                note(f"{probe_type}.periodSeconds for container '{name}' raised to {stretched} to keep a {window}s failure window.")
+        probes.append(aca_probe)
     return probes
 
 
 # ===================== Main Conversion Logic =====================
 
-def convert_k8s_to_aca(input_file, output_file=None): 
-    # Collect all manifests into a list
-    manifests = []
-    with open(input_file, 'r') as f:
-        for manifest in yaml.safe_load_all(f):
-            if manifest:
-                manifests.append(manifest)
-                print(f"Processing resource: {manifest.get('kind')}")
+def iter_export_documents(root):
+    # Yield (source_file, document) for every Kubernetes object in a directory tree,
+    # flattening `kind: List` exports produced by `kubectl get -o yaml`.
+    if os.path.isfile(root):
+        paths = [root]
+    else:
+        paths = []
+        for dirpath, _, filenames in os.walk(root):
+            for filename in sorted(filenames):
+                if filename.endswith(('.yaml', '.yml')):
+                    paths.append(os.path.join(dirpath, filename))
+    for path in sorted(paths):
+        with open(path, 'r') as f:
+            try:
+                documents = list(yaml.safe_load_all(f))
+            except yaml.YAMLError as e:
+                print(f"[Warning] Skipping {path}: invalid YAML ({e})")
+                continue
+        for doc in documents:
+            if not isinstance(doc, dict):
+                continue
+            if doc.get('kind') == 'List':
+                for item in doc.get('items') or []:
+                    if isinstance(item, dict):
+                        yield path, item
             else:
-                print("Skipping empty manifest")
+                yield path, doc
 
-    # Separate resources
+def classify_resources(manifests):
+    # Split parsed manifests into pod-spec resources and the resources they can reference.
     configmaps = {}
     secrets = {}
     services = []
@@ -292,183 +504,333 @@ def convert_k8s_to_aca(input_file, output_file=None):
             ingresses.append(manifest)
         else:
             unsupported.append(manifest)
+    return pod_resources, configmaps, secrets, services, ingresses, unsupported
 
-    if not pod_resources:
-        print("[Error] No pod-spec resources (Deployment, ReplicaSet, Pod) found in manifest.")
-        sys.exit(1)
+def map_pod_resource(pod_resource, configmaps, secrets, services, ingresses):
+    # Map one Deployment/ReplicaSet/Pod, with the Service and Ingress in front of it,
+    # to an ACA template. Returns (aca_template, migration_report).
+    migration_report = []
 
-    # Process each pod resource
-    for pod_resource in pod_resources:
-        migration_report = []
+    # Extract pod spec and containers
+    if pod_resource.get('kind') in ['Deployment', 'ReplicaSet']:
+        pod_spec = pod_resource.get('spec', {}).get('template', {}).get('spec', {})
+    else:
+        pod_spec = pod_resource.get('spec', {})
 
-        # Extract pod spec and containers
-        if pod_resource.get('kind') in ['Deployment', 'ReplicaSet']:
-            pod_spec = pod_resource.get('spec', {}).get('template', {}).get('spec', {})
-        else:
-            pod_spec = pod_resource.get('spec', {})
-
-        containers = pod_spec.get('containers', [])
-        volumes = pod_spec.get('volumes', [])
-
-        aca_containers = []
-        dedicated_profile_needed = False
-
-        # Containers
-        for container in containers:
-            resources = container.get('resources', {})
-            limits = resources.get('limits', {})
-            requests = resources.get('requests', {})
-
-            cpu = 2.0
-            memory = "8.0Gi"
-
-            if 'cpu' in limits:
-                try:
-                    cpu = float(str(limits['cpu']).replace('m', '')) / 1000 if 'm' in str(limits['cpu']) else float(limits['cpu'])
-                except Exception:
-                    migration_report.append(f"[Warning] Could not parse CPU limit for container {container.get('name')}. Using default 2.0.")
-            elif 'cpu' in requests:
-                try:
-                    cpu = float(str(requests['cpu']).replace('m', '')) / 1000 if 'm' in str(requests['cpu']) else float(requests['cpu'])
-                except Exception:
-                    migration_report.append(f"[Warning] Could not parse CPU request for container {container.get('name')}. Using default 2.0.")
-
-            if 'memory' in limits:
-                memory = str(limits['memory'])
-            elif 'memory' in requests:
-                memory = str(requests['memory'])
-
-            if memory.endswith('Mi'):
-                try:
-                    mem_gi = round(float(memory.replace('Mi', '')) / 1024, 1)
-                    memory = f"{mem_gi}Gi"
-                except Exception:
-                    migration_report.append(f"[Warning] Could not parse memory for container {container.get('name')}. Using default 8.0Gi.")
-                    memory = "8.0Gi"
-                    mem_gi = 8.0
-            elif memory.endswith('Gi'):
-                try:
-                    mem_gi = float(memory.replace('Gi', ''))
-                except Exception:
-                    mem_gi = 8.0
-            else:
-                migration_report.append(f"[Warning] Memory value '{memory}' not in Mi/Gi. Using default 8.0Gi.")
-                mem_gi = 8.0
-                memory = "8.0Gi"
-
-            if mem_gi > 8.0:
-                dedicated_profile_needed = True
-                migration_report.append(f"[Info] Container '{container.get('name')}' requests >8Gi memory. Will assign Dedicated Workload Profile in ACA.")
-
-            aca_container = {
-                "name": container.get('name'),
-                "image": container.get('image'),
-                "resources": {"cpu": cpu, "memory": memory},
-            }
+    containers = pod_spec.get('containers', [])
+    volumes = pod_spec.get('volumes', [])
 
-            gpu_count = detect_gpu(container)
-            if gpu_count:
-                count, sku = map_gpu_to_aca(gpu_count)
-                if count and sku:
-                    aca_container["resources"]["gpus"] = count
-                    aca_container["resources"]["gpuSku"] = sku
-                else:
-                    migration_report.append(f"GPU mapping skipped for container {container.get('name')}. Will run on CPU only.")
-
-            aca_container["env"] = map_env_vars(container, configmaps, secrets)
-            aca_container["ports"] = map_ports(container)
-            probes = map_probes(container)
-            if probes:
-                aca_container["probes"] = probes
-
-            if 'volumeMounts' in container:
-                aca_container["volumeMounts"] = map_volumes(volumes, container['volumeMounts'])
-
-            aca_containers.append(aca_container)
-
-        labels = pod_resource.get('metadata', {}).get('labels', {})
-        annotations = pod_resource.get('metadata', {}).get('annotations', {})
-
-        aca_ingress = None
-        if services:
-            svc = services[0]
-            svc_type = svc.get('spec', {}).get('type', 'ClusterIP')
-            ports = svc.get('spec', {}).get('ports', [])
-            if svc_type in ['LoadBalancer', 'NodePort']:
-                aca_ingress = {
-                    "external": True,
-                    "targetPort": ports[0]['targetPort'] if ports else 80,
-                    "transport": "auto"
-                }
-                migration_report.append(f"Service '{svc['metadata']['name']}' mapped to ACA ingress (external).")
-            elif svc_type == 'ClusterIP':
-                aca_ingress = {
-                    "external": False,
-                    "targetPort": ports[0]['targetPort'] if ports else 80,
-                    "transport": "auto"
-                }
-                migration_report.append(f"Service '{svc['metadata']['name']}' mapped to ACA ingress (internal).")
-            else:
-                migration_report.append(f"Service type '{svc_type}' for '{svc['metadata']['name']}' not directly supported. Manual review needed.")
-
-        if ingresses:
-            ing = ingresses[0]
-            rules = ing.get('spec', {}).get('rules', [])
-            if aca_ingress:
-                aca_ingress['customDomains'] = [r['host'] for r in rules if 'host' in r]
-                migration_report.append(f"Ingress '{ing['metadata']['name']}' custom domains mapped to ACA ingress.")
-            else:
-                migration_report.append(f"Ingress '{ing['metadata']['name']}' found, but no Service mapped. Manual review needed.")
-
-        for item in unsupported:
-            kind = item.get('kind', 'Unknown')
-            name = item.get('metadata', {}).get('name', 'unnamed')
-            migration_report.append(f"[Unsupported] {kind} '{name}' is not supported in ACA. Manual migration required.")
-
-        aca_template = {
-            "type": "Microsoft.App/containerApps",
-            "properties": {
-                "template": {
-                    "containers": aca_containers
-                },
-                "labels": labels,
-                "annotations": annotations
-            }
+    aca_containers = []
+    total_cpu = 0.0
+    total_memory_gi = 0.0
+    gpu_skus = []
+
+    # Containers
+    for container in containers:
+        resources = container.get('resources', {})
+        limits = resources.get('limits', {})
+        requests = resources.get('requests', {})
+
+        cpu = resolve_quantity(limits, requests, 'cpu', parse_cpu_quantity, DEFAULT_CPU, container, migration_report)
+        mem_gi = resolve_quantity(limits, requests, 'memory', parse_memory_quantity, DEFAULT_MEMORY_GI, container, migration_report)
+        memory = f"{round(mem_gi, 2)}Gi"
+        total_cpu += cpu
+        total_memory_gi += mem_gi
+
+        aca_container = {
+            "name": container.get('name'),
+            "image": container.get('image'),
+            "resources": {"cpu": cpu, "memory": memory},
         }
 
+        gpu_count = detect_gpu(container)
+        if gpu_count:
+            count, sku = map_gpu_to_aca(gpu_count)
+            if count and sku:
+                aca_container["resources"]["gpus"] = count
+                aca_container["resources"]["gpuSku"] = sku
+                gpu_skus.append(sku)
+            else:
+                migration_report.append(f"GPU mapping skipped for container {container.get('name')}. Will run on CPU only.")
+
+        aca_container["env"] = map_env_vars(container, configmaps, secrets)
+        aca_container["ports"] = map_ports(container)
+        probes = map_probes(container, migration_report)
+        if probes:
+            aca_container["probes"] = probes
+
+        if 'volumeMounts' in container:
+            aca_container["volumeMounts"] = map_volumes(volumes, container['volumeMounts'])
+
+        aca_containers.append(aca_container)
+
+    labels = pod_resource.get('metadata', {}).get('labels', {})
+    annotations = pod_resource.get('metadata', {}).get('annotations', {})
+
+    aca_ingress = None
+    if services:
+        svc = services[0]
+        svc_type = svc.get('spec', {}).get('type', 'ClusterIP')
+        ports = svc.get('spec', {}).get('ports', [])
+        if svc_type in ['LoadBalancer', 'NodePort', 'ClusterIP']:
+            external = svc_type != 'ClusterIP'
+            aca_ingress = map_service_ports(svc, ports, containers, external, migration_report)
+            migration_report.append(f"Service '{svc['metadata']['name']}' mapped to ACA ingress ({'external' if external else 'internal'}, transport {aca_ingress['transport']}).")
+        else:
+            migration_report.append(f"Service type '{svc_type}' for '{svc['metadata']['name']}' not directly supported. Manual review needed.")
+
+    if ingresses:
+        ing = ingresses[0]
+        rules = ing.get('spec', {}).get('rules', [])
         if aca_ingress:
-            aca_template["properties"]["ingress"] = aca_ingress
+            aca_ingress['customDomains'] = [r['host'] for r in rules if 'host' in r]
+            migration_report.append(f"Ingress '{ing['metadata']['name']}' custom domains mapped to ACA ingress.")
+        else:
+            migration_report.append(f"Ingress '{ing['metadata']['name']}' found, but no Service mapped. Manual review needed.")
+
+    aca_template = {
+        "type": "Microsoft.App/containerApps",
+        "properties": {
+            "template": {
+                "containers": aca_containers
+            },
+            "labels": labels,
+            "annotations": annotations
+        }
+    }
+
+    if aca_ingress:
+        aca_template["properties"]["ingress"] = aca_ingress
+
+    if len(set(gpu_skus)) > 1:
+        migration_report.append(f"[Warning] Containers use different GPU SKUs ({', '.join(sorted(set(gpu_skus)))}), but an app runs on one GPU profile. Using {gpu_skus[0]}; manual review needed.")
+    profile = select_workload_profile(total_cpu, total_memory_gi, gpu_skus[0] if gpu_skus else None)
+    if profile:
+        aca_template["properties"]["workloadProfileName"] = profile
+        if gpu_skus:
+            migration_report.append(f"[Info] '{profile}' GPU workload profile assigned in ACA template for {gpu_skus[0]} GPUs.")
+            profile_gpus = GPU_WORKLOAD_PROFILES[gpu_skus[0]]["gpus"]
+            total_gpus = sum(c["resources"].get("gpus", 0) for c in aca_containers)
+            if total_gpus > profile_gpus:
+                migration_report.append(f"[Warning] App requests {total_gpus} GPUs, but '{profile}' provides {profile_gpus} per replica. Split the work across replicas or use a Dedicated GPU workload profile.")
+        else:
+            migration_report.append(f"[Info] App needs {total_cpu:g} vCPU/{total_memory_gi:g}Gi, above the Consumption limit of {CONSUMPTION_MAX_CPU:g} vCPU/{CONSUMPTION_MAX_MEMORY_GI:g}Gi. 'Dedicated' workload profile assigned in ACA template.")
+    elif aca_containers:
+        # Consumption only accepts fixed vCPU/memory combinations for the whole app; round the
+        # total up to the nearest one and give the difference to the first container.
+        written_cpu = sum(c["resources"]["cpu"] for c in aca_containers)
+        written_memory = sum(float(c["resources"]["memory"][:-2]) for c in aca_containers)
+        cpu, memory = consumption_allocation(written_cpu, written_memory)
+        if abs(cpu - written_cpu) > 1e-6 or abs(memory - written_memory) > 1e-6:
+            first = aca_containers[0]["resources"]
+            first["cpu"] = round(first["cpu"] + cpu - written_cpu, 3)
+            first["memory"] = f"{round(float(first['memory'][:-2]) + memory - written_memory, 2)}Gi"
+            migration_report.append(f"[Info] App needs {written_cpu:g} vCPU/{written_memory:g}Gi, which is not an allowed Consumption combination. Rounded up to {cpu:g} vCPU/{memory:g}Gi; the difference was added to container {aca_containers[0]['name']}.")
+
+    return aca_template, migration_report
+
+def report_unsupported(unsupported, migration_report):
+    for item in unsupported:
+        kind = item.get('kind', 'Unknown')
+        name = item.get('metadata', {}).get('name', 'unnamed')
+        migration_report.append(f"[Unsupported] {kind} '{name}' is not supported in ACA. Manual migration required.")
+
+def write_outputs(aca_template, migration_report, out_file):
+    # Write an ACA template and its migration report (<out_file stem>.migration.txt),
+    # after checking the template against ACA constraints.
+    violations = validate_template(aca_template)
+    for violation in violations:
+        print(f"[Warning] Invalid ACA template at {violation.path}: {violation.message}")
+        migration_report.append(f"[Invalid] {violation.path}: {violation.message}")
+
+    report_file = os.path.splitext(out_file)[0] + ".migration.txt"
+
+    abs_out_file = os.path.abspath(out_file)
+    abs_report_file = os.path.abspath(report_file)
 
-        if dedicated_profile_needed:
-            aca_template["properties"]["workloadProfileName"] = "Dedicated"
-            migration_report.append("[Info] 'Dedicated' workload profile assigned in ACA template for containers requiring >8GiB memory.")
+    with open(out_file, 'w') as f:
+        yaml.dump(aca_template, f)
+    print(f"[Success] ACA template written to {abs_out_file}")
+
+    with open(report_file, 'w') as f:
+        for line in migration_report:
+            f.write(line + '\n')
+    print(f"[Info] Migration report written to {abs_report_file}")
+
+def convert_k8s_to_aca(input_file, output_file=None): 
+    # Collect all manifests into a list
+    manifests = []
+    with open(input_file, 'r') as f:
+        for manifest in yaml.safe_load_all(f):
+            if manifest:
+                manifests.append(manifest)
+                print(f"Processing resource: {manifest.get('kind')}")
+            else:
+                print("Skipping empty manifest")
+
+    # Separate resources
+    pod_resources, configmaps, secrets, services, ingresses, unsupported = classify_resources(manifests)
+
+    if not pod_resources:
+        print("[Error] No pod-spec resources (Deployment, ReplicaSet, Pod) found in manifest.")
+        sys.exit(1)
+
+    # Process each pod resource
+    for pod_resource in pod_resources:
+        aca_template, migration_report = map_pod_resource(pod_resource, configmaps, secrets, services, ingresses)
+        report_unsupported(unsupported, migration_report)
 
         # Determine output paths
         app_name = pod_resource.get('metadata', {}).get('name', 'aca-app')
         out_file = output_file if output_file else f"{app_name}.aca.yaml"
-        report_file = os.path.splitext(out_file)[0] + ".migration.txt"
+        write_outputs(aca_template, migration_report, out_file)
+
+
+# ===================== Batch Conversion =====================
+
+def referenced_config(pod_spec, configmaps, secrets):
+    # Collect the ConfigMap and Secret data a pod spec actually references, keyed by name.
+    refs = {"configMaps": {}, "secrets": {}}
+    for container in pod_spec.get('containers', []):
+        for env in container.get('env', []):
+            src = env.get('valueFrom', {})
+            if 'configMapKeyRef' in src:
+                name = src['configMapKeyRef']['name']
+                refs["configMaps"][name] = configmaps.get(name)
+            elif 'secretKeyRef' in src:
+                name = src['secretKeyRef']['name']
+                refs["secrets"][name] = secrets.get(name)
+    return refs
+
+def select_services(pod_resource, services):
+    # Services whose selector matches the pod template labels. A workload no Service
+    # selects gets no ingress.
+    if pod_resource.get('kind') == 'Pod':
+        pod_labels = pod_resource.get('metadata', {}).get('labels', {})
+    else:
+        pod_labels = pod_resource.get('spec', {}).get('template', {}).get('metadata', {}).get('labels', {})
+    matched = [
+        svc for svc in services
+        if svc.get('spec', {}).get('selector')
+        and all(pod_labels.get(k) == v for k, v in svc['spec']['selector'].items())
+    ]
+    return matched
+
+def ingress_backend_services(ingress):
+    # Names of the Services an Ingress routes to (networking.k8s.io/v1 and v1beta1 backends)
+    spec = ingress.get('spec', {})
+    backends = [spec.get('defaultBackend') or spec.get('backend') or {}]
+    for rule in spec.get('rules', []):
+        backends.extend(path.get('backend') or {} for path in (rule.get('http') or {}).get('paths', []))
+    names = set()
+    for backend in backends:
+        name = (backend.get('service') or {}).get('name') or backend.get('serviceName')
+        if name:
+            names.add(name)
+    return names
+
+def select_ingresses(ingresses, services):
+    # Ingresses with a backend on one of the given Services.
+    service_names = {svc['metadata']['name'] for svc in services}
+    return [ing for ing in ingresses if ingress_backend_services(ing) & service_names]
+
+def workload_fingerprint(pod_resource, configmaps, secrets, services, ingresses):
+    # Hash everything map_pod_resource reads except per-copy metadata (name, namespace,
+    # labels, annotations), so identical workloads in different namespaces collide.
+    if pod_resource.get('kind') == 'Pod':
+        pod_spec = pod_resource.get('spec', {})
+    else:
+        pod_spec = pod_resource.get('spec', {}).get('template', {}).get('spec', {})
+    normalized = {
+        "kind": pod_resource.get('kind'),
+        "podSpec": pod_spec,
+        "config": referenced_config(pod_spec, configmaps, secrets),
+        "service": [{"name": s['metadata']['name'], "spec": s.get('spec', {})} for s in services[:1]],
+        "ingress": [{"name": i['metadata']['name'], "rules": i.get('spec', {}).get('rules', [])} for i in ingresses[:1]],
+    }
+    encoded = json.dumps(normalized, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+def aca_app_name(name, namespace):
+    # ACA app names: lowercase letters, digits and '-', start with a letter, at most 32 characters
+    candidate = re.sub(r'[^a-z0-9-]+', '-', f"{name}-{namespace}".lower())
+    candidate = re.sub(r'-{2,}', '-', candidate).strip('-')
+    if not candidate or not candidate[0].isalpha():
+        candidate = f"app-{candidate}"
+    if len(candidate) > 32:
+        digest = hashlib.sha256(candidate.encode()).hexdigest()[:6]
+        candidate = f"{candidate[:25].rstrip('-')}-{digest}"
+    return candidate
+
+def convert_export_tree(input_root, output_dir):
+    # Convert every workload under an export directory. Workloads with the same fingerprint
+    # are mapped once and the result is reused, renamed for each namespace.
+    base_dir = input_root if os.path.isdir(input_root) else os.path.dirname(input_root)
+    namespaces = {}
+    for path, doc in iter_export_documents(input_root):
+        metadata = doc.get('metadata') or {}
+        # Pods and ReplicaSets owned by a controller are converted via that controller
+        if doc.get('kind') in ['ReplicaSet', 'Pod'] and metadata.get('ownerReferences'):
+            continue
+        key = (os.path.relpath(os.path.dirname(path), base_dir), metadata.get('namespace', 'default'))
+        namespaces.setdefault(key, []).append(doc)
+
+    mapped = {}
+    written = set()
+    converted = reused = 0
+    for (rel_dir, namespace), manifests in namespaces.items():
+        pod_resources, configmaps, secrets, services, ingresses, unsupported = classify_resources(manifests)
+        for pod_resource in pod_resources:
+            name = pod_resource.get('metadata', {}).get('name', 'aca-app')
+            app_services = select_services(pod_resource, services)
+            app_ingresses = select_ingresses(ingresses, app_services[:1])
+            fingerprint = workload_fingerprint(pod_resource, configmaps, secrets, app_services, app_ingresses)
+            if fingerprint in mapped:
+                template, report, source = mapped[fingerprint]
+                aca_template = copy.deepcopy(template)
+                migration_report = list(report)
+                migration_report.append(f"[Info] Mapping reused from identical workload '{source}'.")
+                reused += 1
+            else:
+                aca_template, migration_report = map_pod_resource(pod_resource, configmaps, secrets, app_services, app_ingresses)
+                mapped[fingerprint] = (copy.deepcopy(aca_template), list(migration_report), f"{namespace}/{name}")
+                converted += 1
+
+            # Exports of a single namespace already sit in a directory named after it
+            out_dir = os.path.normpath(os.path.join(output_dir, rel_dir))
+            if os.path.basename(out_dir) != namespace:
+                out_dir = os.path.join(out_dir, namespace)
+
+            # A Deployment and a standalone Pod may share a name; keep both by adding the kind
+            app_name = name
+            if os.path.join(out_dir, name) in written:
+                app_name = f"{name}-{pod_resource.get('kind', 'workload').lower()}"
+                migration_report.append(f"[Warning] Another workload named '{name}' exists in namespace '{namespace}'. Output renamed to '{app_name}'.")
+            written.add(os.path.join(out_dir, app_name))
 
-        abs_out_file = os.path.abspath(out_file)
-        abs_report_file = os.path.abspath(report_file)
+            metadata = pod_resource.get('metadata', {})
+            aca_template["name"] = aca_app_name(app_name, namespace)
+            aca_template["properties"]["labels"] = metadata.get('labels', {})
+            aca_template["properties"]["annotations"] = metadata.get('annotations', {})
+            report_unsupported(unsupported, migration_report)
 
-        # Write ACA template and report
-        with open(out_file, 'w') as f:
-            yaml.dump(aca_template, f)
-        print(f"[Success] ACA template written to {abs_out_file}")
+            os.makedirs(out_dir, exist_ok=True)
+            write_outputs(aca_template, migration_report, os.path.join(out_dir, f"{app_name}.aca.yaml"))
 
-        with open(report_file, 'w') as f:
-            for line in migration_report:
-                f.write(line + '\n')
-        print(f"[Info] Migration report written to {abs_report_file}")
+    print(f"[Info] {converted + reused} workloads converted ({converted} mapped, {reused} reused from duplicates).")
 
 
 # ===================== Entry Point =====================
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python main.py <input-k8s-manifest.yaml> [output-aca-template.yaml]")
+        print("       python main.py <export-directory> [output-directory]")
         sys.exit(1)
 
     input_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
 
-    convert_k8s_to_aca(input_file, output_file)
+    if os.path.isdir(input_file):
+        convert_export_tree(input_file, output_file or "aca_output")
+    else:
+        convert_k8s_to_aca(input_file, output_file)
@@ -0,0 +1,238 @@
+"""
+k8s2aca: ACA template validator
+
+Checks generated Container Apps templates against ACA platform constraints
+(CPU/memory combinations per workload profile, GPU limits, probe bounds, port
+ranges and name rules) and reports every violation with its resource path.
+The rule tables are built once at import so large batches validate quickly.
+"""
+
+# ===================== Imports =====================
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import yaml
+
+from aca_limits import GPU_WORKLOAD_PROFILES, PROBE_LIMITS, PROBE_TYPES, SUPPORTED_GPU_SKUS
+
+# ===================== Compiled Rule Set =====================
+Violation = namedtuple("Violation", ["path", "message"])
+
+# Consumption apps must use one of the fixed pairs 0.25 vCPU/0.5Gi ... 4 vCPU/8Gi,
+# stored as (quarter-vCPU, quarter-GiB) integers so lookups avoid float comparison
+CONSUMPTION_PAIRS = frozenset((q, q * 2) for q in range(1, 17))
+
+# Largest app a Dedicated workload profile can host (E32: 32 vCPU, 256Gi)
+DEDICATED_MAX_CPU = 32.0
+DEDICATED_MAX_MEMORY_GI = 256.0
+
+MAX_GPUS = 4
+GPU_SKUS = frozenset(SUPPORTED_GPU_SKUS)
+# Serverless GPU profile name -> (GPU SKU, GPUs per replica, max vCPU, max GiB)
+GPU_PROFILES = {p["name"]: (sku, p["gpus"], p["cpu"], p["memory_gi"]) for sku, p in GPU_WORKLOAD_PROFILES.items()}
+GPU_PROFILE_NAMES = ", ".join(sorted(GPU_PROFILES))
+MAX_ADDITIONAL_PORTS = 5
+TRANSPORTS = frozenset(["auto", "http", "http2", "tcp"])
+ACA_PROBE_TYPES = frozenset(PROBE_TYPES.values())
+PROBE_BOUNDS = tuple(PROBE_LIMITS.items())
+
+APP_NAME_RE = re.compile(r"^[a-z][a-z0-9-]{0,30}[a-z0-9]$")
+CONTAINER_NAME_RE = re.compile(r"^[a-z0-9]([-a-z0-9]{0,61}[a-z0-9])?$")
+
+
+@lru_cache(maxsize=1024)
+def _memory_gi(value):
+    # ACA memory is always expressed in Gi (e.g. "0.5Gi")
+    if not value.endswith("Gi"):
+        return None
+    try:
+        return float(value[:-2])
+    except ValueError:
+        return None
+
+
+def _quarters(value):
+    # Express a quantity in quarter units, or None if it is not a whole number of quarters
+    quarters = value * 4
+    rounded = round(quarters)
+    return rounded if abs(quarters - rounded) < 1e-6 else None
+
+
+# ===================== Validation =====================
+def validate_template(template):
+    # Validate one ACA template dict. Returns a list of Violations (empty if valid).
+    violations = []
+    add = violations.append
+
+    if "name" in template:
+        name = str(template["name"])
+        if not APP_NAME_RE.match(name) or "--" in name:
+            add(Violation("name", f"App name '{name}' must be 2-32 lowercase letters, digits or '-', start with a letter, end with a letter or digit and not contain '--'"))
+
+    properties = template.get("properties") or {}
+    containers = (properties.get("template") or {}).get("containers") or []
+    if not containers:
+        add(Violation("properties.template.containers", "At least one container is required"))
+
+    profile = properties.get("workloadProfileName") or "Consumption"
+    gpu_profile = GPU_PROFILES.get(profile)
+    total_cpu = 0.0
+    total_memory = 0.0
+    total_gpus = 0
+    resources_valid = True
+
+    for i, container in enumerate(containers):
+        path = f"properties.template.containers[{i}]"
+        name = container.get("name")
+        if not name or not CONTAINER_NAME_RE.match(str(name)):
+            add(Violation(f"{path}.name", f"Container name '{name}' must be a lowercase DNS label of at most 63 characters"))
+        if not container.get("image"):
+            add(Violation(f"{path}.image", "Container image is required"))
+
+        resources = container.get("resources") or {}
+        try:
+            cpu = float(resources.get("cpu"))
+        except (TypeError, ValueError):
+            cpu = None
+        memory = _memory_gi(str(resources.get("memory")))
+        if cpu is None or cpu <= 0:
+            add(Violation(f"{path}.resources.cpu", f"CPU '{resources.get('cpu')}' must be a positive number"))
+            resources_valid = False
+        if memory is None or memory <= 0:
+            add(Violation(f"{path}.resources.memory", f"Memory '{resources.get('memory')}' must be a positive quantity in Gi"))
+            resources_valid = False
+        if resources_valid:
+            total_cpu += cpu
+            total_memory += memory
+
+        if "gpus" in resources:
+            gpus = resources["gpus"]
+            total_gpus += gpus if isinstance(gpus, int) else 0
+            if not isinstance(gpus, int) or not 1 <= gpus <= MAX_GPUS:
+                add(Violation(f"{path}.resources.gpus", f"GPU count {gpus} must be between 1 and {MAX_GPUS}"))
+            if resources.get("gpuSku") not in GPU_SKUS:
+                add(Violation(f"{path}.resources.gpuSku", f"GPU SKU '{resources.get('gpuSku')}' must be one of {sorted(GPU_SKUS)}"))
+            elif not gpu_profile:
+                add(Violation(f"{path}.resources.gpus", f"GPUs require a GPU workload profile ({GPU_PROFILE_NAMES}), not '{profile}'"))
+            elif resources.get("gpuSku") != gpu_profile[0]:
+                add(Violation(f"{path}.resources.gpuSku", f"GPU SKU '{resources.get('gpuSku')}' does not match workload profile '{profile}' ({gpu_profile[0]})"))
+            elif isinstance(gpus, int) and gpus > gpu_profile[1]:
+                add(Violation(f"{path}.resources.gpus", f"GPU count {gpus} exceeds workload profile '{profile}' ({gpu_profile[1]} per replica)"))
+
+        for j, port in enumerate(container.get("ports") or []):
+            _check_port(port.get("port"), f"{path}.ports[{j}].port", add)
+
+        _check_probes(container.get("probes") or [], f"{path}.probes", add)
+
+    if resources_valid and containers:
+        if gpu_profile:
+            _, _, max_cpu, max_memory = gpu_profile
+            if total_cpu > max_cpu or total_memory > max_memory:
+                add(Violation("properties.template.containers", f"Total {total_cpu:g} vCPU/{total_memory:g}Gi exceeds GPU profile '{profile}' ({max_cpu:g} vCPU/{max_memory:g}Gi)"))
+        elif profile != "Consumption":
+            if total_cpu > DEDICATED_MAX_CPU or total_memory > DEDICATED_MAX_MEMORY_GI:
+                add(Violation("properties.template.containers", f"Total {total_cpu:g} vCPU/{total_memory:g}Gi exceeds the largest Dedicated profile ({DEDICATED_MAX_CPU:g} vCPU/{DEDICATED_MAX_MEMORY_GI:g}Gi)"))
+        elif (_quarters(total_cpu), _quarters(total_memory)) not in CONSUMPTION_PAIRS:
+            add(Violation("properties.template.containers", f"Total {total_cpu:g} vCPU/{total_memory:g}Gi is not an allowed Consumption combination (0.25 vCPU/0.5Gi steps up to 4 vCPU/8Gi)"))
+    if total_gpus > MAX_GPUS:
+        add(Violation("properties.template.containers", f"App requests {total_gpus} GPUs; ACA allows at most {MAX_GPUS}"))
+    elif gpu_profile and total_gpus > gpu_profile[1]:
+        add(Violation("properties.template.containers", f"App requests {total_gpus} GPUs; workload profile '{profile}' provides {gpu_profile[1]} per replica"))
+
+    ingress = properties.get("ingress") or (properties.get("configuration") or {}).get("ingress")
+    if ingress:
+        _check_ingress(ingress, "properties.ingress" if "ingress" in properties else "properties.configuration.ingress", add)
+
+    return violations
+
+
+def _check_port(port, path, add):
+    if not isinstance(port, int) or not 1 <= port <= 65535:
+        add(Violation(path, f"Port {port!r} must be an integer between 1 and 65535"))
+
+
+def _check_probes(probes, path, add):
+    seen = set()
+    for k, probe in enumerate(probes):
+        probe_path = f"{path}[{k}]"
+        probe_type = probe.get("type")
+        if probe_type not in ACA_PROBE_TYPES:
+            add(Violation(f"{probe_path}.type", f"Probe type '{probe_type}' must be one of {sorted(ACA_PROBE_TYPES)}"))
+        elif probe_type in seen:
+            add(Violation(f"{probe_path}.type", f"Only one {probe_type} probe is allowed per container"))
+        seen.add(probe_type)
+        if "httpGet" in probe:
+            _check_port(probe["httpGet"].get("port"), f"{probe_path}.httpGet.port", add)
+        elif "tcpSocket" in probe:
+            _check_port(probe["tcpSocket"].get("port"), f"{probe_path}.tcpSocket.port", add)
+        else:
+            add(Violation(probe_path, "Probe must define httpGet or tcpSocket"))
+        for field, (low, high) in PROBE_BOUNDS:
+            if field in probe and not (isinstance(probe[field], int) and low <= probe[field] <= high):
+                add(Violation(f"{probe_path}.{field}", f"{field} {probe[field]!r} must be between {low} and {high}"))
+
+
+def _check_ingress(ingress, path, add):
+    _check_port(ingress.get("targetPort"), f"{path}.targetPort", add)
+    transport = ingress.get("transport", "auto")
+    if transport not in TRANSPORTS:
+        add(Violation(f"{path}.transport", f"Transport '{transport}' must be one of {sorted(TRANSPORTS)}"))
+    if transport == "tcp":
+        if "exposedPort" not in ingress:
+            add(Violation(f"{path}.exposedPort", "TCP transport requires an exposedPort"))
+        else:
+            _check_port(ingress["exposedPort"], f"{path}.exposedPort", add)
+    mappings = ingress.get("additionalPortMappings") or []
+    if len(mappings) > MAX_ADDITIONAL_PORTS:
+        add(Violation(f"{path}.additionalPortMappings", f"{len(mappings)} additional ports exceed the ACA limit of {MAX_ADDITIONAL_PORTS}"))
+    for m, mapping in enumerate(mappings):
+        _check_port(mapping.get("targetPort"), f"{path}.additionalPortMappings[{m}].targetPort", add)
+        if "exposedPort" in mapping:
+            _check_port(mapping["exposedPort"], f"{path}.additionalPortMappings[{m}].exposedPort", add)
+
+
+def validate_templates(templates):
+    # Batch mode: validate an iterable of (source, template) pairs.
+    # Returns a list of (source, Violation) for every violation found.
+    return [(source, violation) for source, template in templates for violation in validate_template(template)]
+
+
+# ===================== File Loading =====================
+def iter_template_files(paths):
+    # Yield (file, template) for every ACA template found in the given files or directories.
+    for root in paths:
+        if os.path.isfile(root):
+            files = [root]
+        else:
+            files = sorted(
+                os.path.join(dirpath, filename)
+                for dirpath, _, filenames in os.walk(root)
+                for filename in filenames if filename.endswith(('.yaml', '.yml'))
+            )
+        for path in files:
+            with open(path, 'r') as f:
+                for doc in yaml.safe_load_all(f):
+                    if isinstance(doc, dict) and doc.get("type") == "Microsoft.App/containerApps":
+                        yield path, doc
+
+
+# ===================== Entry Point =====================
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python validator.py <aca-template.yaml | directory> [...]")
+        sys.exit(1)
+
+    templates = list(iter_template_files(sys.argv[1:]))
+    start = time.perf_counter()
+    results = validate_templates(templates)
+    elapsed = time.perf_counter() - start
+
+    for source, violation in results:
+        print(f"[Invalid] {source}: {violation.path}: {violation.message}")
+    rate = len(templates) / elapsed if elapsed > 0 else float('inf')
+    print(f"[Info] Validated {len(templates)} templates in {elapsed:.3f}s ({rate:,.0f}/s), {len(results)} violations.")
+    sys.exit(1 if results else 0)
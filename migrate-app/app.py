@@ -1,27 +1,128 @@
-from flask import Flask, render_template_string
+from flask import Flask, render_template_string, jsonify
 import os
 import socket
+import threading
+import time
+from datetime import datetime, timezone
 import psutil
 import requests
 
 app = Flask(__name__)
 
-@app.route('/')
-def index():
-    # Get system memory
+# How often each value is refreshed in the background. A value is reported as stale
+# once it is older than its TTL plus the time a refresh may take (its grace period).
+MEMORY_TTL = float(os.environ.get('MEMORY_TTL', 5))
+PUBLIC_IP_TTL = float(os.environ.get('PUBLIC_IP_TTL', 300))
+PUBLIC_IP_TIMEOUT = float(os.environ.get('PUBLIC_IP_TIMEOUT', 2))
+PUBLIC_IP_URL = 'https://api.ipify.org'
+
+
+class CachedValue:
+    # A value refreshed by a background thread. Readers never block on the refresh;
+    # they get the last good value plus the time it went stale, if it has.
+    def __init__(self, name, ttl, grace, fetch, default):
+        self.name = name
+        self.ttl = ttl
+        self.grace = grace
+        self.fetch = fetch
+        self.value = default
+        self.updated_at = None
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        try:
+            value = self.fetch()
+        except Exception as e:
+            app.logger.warning("Refreshing %s failed: %s", self.name, e)
+            return False
+        with self.lock:
+            self.value = value
+            self.updated_at = time.time()
+        return True
+
+    def snapshot(self):
+        with self.lock:
+            value, updated_at = self.value, self.updated_at
+        stale_since = None
+        if updated_at is None:
+            stale_since = STARTED_AT
+        elif time.time() - updated_at > self.ttl + self.grace:
+            stale_since = updated_at + self.ttl + self.grace
+        return value, updated_at, stale_since
+
+    def run(self):
+        while True:
+            # Retry failed refreshes sooner than the TTL so a transient outage clears quickly
+            ok = self.refresh()
+            time.sleep(self.ttl if ok else min(self.ttl, 10))
+
+
+def fetch_memory():
     memory = psutil.virtual_memory()
-    total_memory = f"{memory.total / (1024 ** 3):.2f} GB"
-    used_memory = f"{memory.used / (1024 ** 3):.2f} GB"
-    free_memory = f"{memory.available / (1024 ** 3):.2f} GB"
+    return {
+        "total_memory": f"{memory.total / (1024 ** 3):.2f} GB",
+        "used_memory": f"{memory.used / (1024 ** 3):.2f} GB",
+        "free_memory": f"{memory.available / (1024 ** 3):.2f} GB",
+    }
+
+
+def fetch_public_ip():
+    response = requests.get(PUBLIC_IP_URL, timeout=PUBLIC_IP_TIMEOUT)
+    response.raise_for_status()
+    return response.text.strip()
+
 
-    # Get hostname
-    hostname = socket.gethostname()
+STARTED_AT = time.time()
+HOSTNAME = socket.gethostname()
+memory_info = CachedValue("memory", MEMORY_TTL, 1.0, fetch_memory,
+                          {"total_memory": "unknown", "used_memory": "unknown", "free_memory": "unknown"})
+public_ip_info = CachedValue("public IP", PUBLIC_IP_TTL, PUBLIC_IP_TIMEOUT + 1.0, fetch_public_ip, "Unable to fetch public IP")
 
-    # Get public IP
-    try:
-        public_ip = requests.get('https://api.ipify.org').text
-    except requests.RequestException:
-        public_ip = "Unable to fetch public IP"
+_refresher_lock = threading.Lock()
+_refreshers_started = False
+
+
+def start_refreshers():
+    # Start one daemon refresher per value; safe to call repeatedly
+    global _refreshers_started
+    with _refresher_lock:
+        if _refreshers_started:
+            return
+        memory_info.refresh()
+        for cached in (memory_info, public_ip_info):
+            threading.Thread(target=cached.run, name=f"refresh-{cached.name}", daemon=True).start()
+        _refreshers_started = True
+
+
+def format_time(timestamp):
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec='seconds')
+
+
+def system_info():
+    start_refreshers()
+    memory, memory_updated, memory_stale = memory_info.snapshot()
+    public_ip, ip_updated, ip_stale = public_ip_info.snapshot()
+    return {
+        "hostname": HOSTNAME,
+        "public_ip": public_ip,
+        "public_ip_updated_at": format_time(ip_updated),
+        "public_ip_stale_since": format_time(ip_stale),
+        **memory,
+        "memory_updated_at": format_time(memory_updated),
+        "memory_stale_since": format_time(memory_stale),
+    }
+
+
+@app.route('/api/info')
+def api_info():
+    return jsonify(system_info())
+
+
+@app.route('/')
+def index():
+    info = system_info()
 
     # HTML template
     html = """
@@ -62,13 +163,14 @@ def index():
         <div class="container">
             <h1>System Information</h1>
             <div class="info">Hostname: <span>{{ hostname }}</span></div>
-            <div class="info">Public IP: <span>{{ public_ip }}</span></div>
-            <div class="info">Memory: <span>{{ used_memory }}</span> used / <span>{{ total_memory }}</span> total</div>
+            <div class="info">Public IP: <span>{{ public_ip }}</span>{% if public_ip_stale_since %} <em>(stale since {{ public_ip_stale_since }})</em>{% endif %}</div>
+            <div class="info">Memory: <span>{{ used_memory }}</span> used / <span>{{ total_memory }}</span> total{% if memory_stale_since %} <em>(stale since {{ memory_stale_since }})</em>{% endif %}</div>
         </div>
     </body>
     </html>
     """
-    return render_template_string(html, hostname=hostname, public_ip=public_ip, total_memory=total_memory, used_memory=used_memory)
+    return render_template_string(html, **info)
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
+    start_refreshers()
+    app.run(host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file